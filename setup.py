@@ -7,24 +7,56 @@ This script helps set up the test environment and validates the configuration.
 import os
 import sys
 import subprocess
+import contextlib
+import functools
+import io
 import json
 import logging
+import queue
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 
 def setup_logging():
-    """Setup logging for the setup process."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler('setup.log')
-        ]
-    )
+    """
+    Setup logging for the setup process.
+    
+    Records are queued and written to the console and setup.log by a
+    background listener, so setup steps never block on log I/O.
+    """
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.StreamHandler(),
+        logging.FileHandler('setup.log')
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    # Flush queued records on exit, including sys.exit() after failed steps
+    atexit.register(listener.stop)
+    
+    # Formatting happens in the listener's handlers
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
     return logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=64)
+def path_exists(path):
+    """
+    Check whether a path exists, caching the result for the rest of the run.
+    
+    Steps that create a path must call ``path_exists.cache_clear()`` afterwards.
+    """
+    return Path(path).exists()
+
+
 def check_python_version():
     """Check if Python version is compatible."""
     logger = logging.getLogger(__name__)
@@ -46,13 +78,14 @@ def create_virtual_environment():
     logger = logging.getLogger(__name__)
     
     venv_path = Path('venv')
-    if venv_path.exists():
+    if path_exists(venv_path):
         logger.info("Virtual environment already exists")
         return True
     
     try:
         logger.info("Creating virtual environment...")
         subprocess.run([sys.executable, '-m', 'venv', 'venv'], check=True)
+        path_exists.cache_clear()
         logger.info("Virtual environment created successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -64,20 +97,23 @@ def install_dependencies():
     """Install required dependencies."""
     logger = logging.getLogger(__name__)
     
-    # Determine the correct pip path
+    # Determine the correct python path (``python -m pip`` can upgrade pip itself)
     if os.name == 'nt':  # Windows
-        pip_path = Path('venv') / 'Scripts' / 'pip.exe'
+        python_path = Path('venv') / 'Scripts' / 'python.exe'
     else:  # Linux/Mac
-        pip_path = Path('venv') / 'bin' / 'pip'
+        python_path = Path('venv') / 'bin' / 'python'
     
-    if not pip_path.exists():
+    if not path_exists(python_path):
         logger.error("Virtual environment not found. Please create it first.")
         return False
     
     try:
         logger.info("Installing dependencies...")
-        subprocess.run([str(pip_path), 'install', '--upgrade', 'pip'], check=True)
-        subprocess.run([str(pip_path), 'install', '-r', 'requirements.txt'], check=True)
+        # Upgrade pip and install requirements in a single pip process
+        subprocess.run([
+            str(python_path), '-m', 'pip', 'install',
+            '--upgrade', 'pip', '-r', 'requirements.txt'
+        ], check=True)
         logger.info("Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -92,11 +128,11 @@ def create_env_file():
     env_file = Path('.env')
     template_file = Path('.env.template')
     
-    if env_file.exists():
+    if path_exists(env_file):
         logger.info(".env file already exists")
         return True
     
-    if not template_file.exists():
+    if not path_exists(template_file):
         logger.warning(".env.template not found, skipping .env creation")
         return True
     
@@ -107,6 +143,7 @@ def create_env_file():
         
         with open(env_file, 'w') as env:
             env.write(content)
+        path_exists.cache_clear()
         
         logger.info(".env file created. Please update it with your actual values.")
         return True
@@ -120,15 +157,15 @@ def create_reports_directory():
     logger = logging.getLogger(__name__)
     
     reports_dir = Path('reports')
-    if not reports_dir.exists():
-        try:
-            reports_dir.mkdir(exist_ok=True)
-            logger.info("Reports directory created")
-        except Exception as e:
-            logger.error(f"Failed to create reports directory: {e}")
-            return False
-    
-    return True
+    try:
+        # exist_ok makes a separate existence check unnecessary
+        reports_dir.mkdir(parents=True, exist_ok=True)
+        path_exists.cache_clear()
+        logger.info("Reports directory ready")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to create reports directory: {e}")
+        return False
 
 
 def validate_test_data():
@@ -136,22 +173,22 @@ def validate_test_data():
     logger = logging.getLogger(__name__)
     
     test_data_file = Path('data') / 'test_data.json'
-    if not test_data_file.exists():
-        logger.error("test_data.json not found")
-        return False
+    required_keys = {'base_url', 'endpoints', 'valid_users'}
     
     try:
-        with open(test_data_file, 'r') as f:
-            test_data = json.load(f)
+        # Read once; a missing file surfaces as FileNotFoundError
+        test_data = json.loads(test_data_file.read_bytes())
         
-        required_keys = ['base_url', 'endpoints', 'valid_users']
-        for key in required_keys:
-            if key not in test_data:
-                logger.error(f"Required key '{key}' not found in test_data.json")
-                return False
+        missing_keys = required_keys - test_data.keys()
+        if missing_keys:
+            logger.error(f"Required keys {sorted(missing_keys)} not found in test_data.json")
+            return False
         
         logger.info("Test data validation passed")
         return True
+    except FileNotFoundError:
+        logger.error("test_data.json not found")
+        return False
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON in test_data.json: {e}")
         return False
@@ -170,12 +207,34 @@ def run_sample_test():
     else:  # Linux/Mac
         python_path = Path('venv') / 'bin' / 'python'
     
-    if not python_path.exists():
+    if not path_exists(python_path):
         logger.error("Virtual environment not found")
         return False
     
     try:
         logger.info("Running sample test to verify setup...")
+        
+        # Already running inside the venv: collect in-process instead of
+        # paying for a second interpreter and pytest startup
+        if Path(sys.prefix).resolve() == Path('venv').resolve():
+            import pytest
+            output = io.StringIO()
+            # Test modules configure logging on import; keep the root logger
+            # exactly as setup configured it
+            root_logger = logging.getLogger()
+            root_handlers = root_logger.handlers[:]
+            try:
+                with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                    exit_code = pytest.main(['--collect-only', '-q'])
+            finally:
+                root_logger.handlers[:] = root_handlers
+            
+            if exit_code == 0:
+                logger.info("Test discovery successful - setup verified!")
+                return True
+            logger.error(f"Test discovery failed with exit code {exit_code}: {output.getvalue()}")
+            return False
+        
         result = subprocess.run([
             str(python_path), '-m', 'pytest', 
             '--collect-only', '-q'
@@ -185,7 +244,7 @@ def run_sample_test():
             logger.info("Test discovery successful - setup verified!")
             return True
         else:
-            logger.error(f"Test discovery failed: {result.stderr}")
+            logger.error(f"Test discovery failed: {result.stdout}{result.stderr}")
             return False
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to run sample test: {e}")
@@ -225,33 +284,55 @@ For more information, see README.md
     logger.info("Setup instructions displayed")
 
 
+def run_step(step_name, step_function):
+    """Run a single setup step and report whether it succeeded."""
+    logger = logging.getLogger(__name__)
+    
+    logger.info(f"Step: {step_name}")
+    try:
+        if not step_function():
+            logger.error(f"Failed: {step_name}")
+            return False
+        logger.info(f"Completed: {step_name}")
+        return True
+    except Exception as e:
+        logger.error(f"Error in {step_name}: {e}")
+        return False
+
+
 def main():
     """Main setup function."""
     logger = setup_logging()
     logger.info("Starting E-commerce API Test Suite setup...")
     
-    steps = [
+    environment_steps = [
         ("Checking Python version", check_python_version),
         ("Creating virtual environment", create_virtual_environment),
-        ("Installing dependencies", install_dependencies),
+        ("Installing dependencies", install_dependencies)
+    ]
+    # Independent of each other, so they run concurrently
+    independent_steps = [
         ("Creating .env file", create_env_file),
         ("Creating reports directory", create_reports_directory),
-        ("Validating test data", validate_test_data),
+        ("Validating test data", validate_test_data)
+    ]
+    verification_steps = [
         ("Running sample test", run_sample_test)
     ]
     
     failed_steps = []
     
-    for step_name, step_function in steps:
-        logger.info(f"Step: {step_name}")
-        try:
-            if not step_function():
-                failed_steps.append(step_name)
-                logger.error(f"Failed: {step_name}")
-            else:
-                logger.info(f"Completed: {step_name}")
-        except Exception as e:
-            logger.error(f"Error in {step_name}: {e}")
+    for step_name, step_function in environment_steps:
+        if not run_step(step_name, step_function):
+            failed_steps.append(step_name)
+    
+    with ThreadPoolExecutor(max_workers=len(independent_steps)) as executor:
+        results = executor.map(lambda step: run_step(*step), independent_steps)
+        failed_steps.extend(step_name for (step_name, _), passed
+                            in zip(independent_steps, results) if not passed)
+    
+    for step_name, step_function in verification_steps:
+        if not run_step(step_name, step_function):
             failed_steps.append(step_name)
     
     if failed_steps:
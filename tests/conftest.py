@@ -0,0 +1,155 @@
+"""
+Shared pytest fixtures for the E-commerce API test suite.
+Builds the API client, helpers and authenticated session once per test
+session so test classes reuse them instead of rebuilding them per test.
+"""
+
+import os
+from collections import namedtuple
+from unittest.mock import patch
+
+import pytest
+import requests
+from urllib3.util.retry import Retry
+from tests.payment_stubs import canned_payment_failure
+from utils.api_helpers import (
+    APIClient, AuthHelper, CartHelper, CheckoutHelper, TestDataLoader
+)
+
+
+# Base URL and endpoint paths, resolved once from the test data
+ApiConfig = namedtuple('ApiConfig', [
+    'base_url', 'health_endpoint', 'login_endpoint', 'profile_endpoint',
+    'cart_endpoint', 'cart_items_endpoint', 'checkout_endpoint', 'orders_endpoint'
+])
+
+
+def pytest_addoption(parser):
+    """Register command line options for the test suite."""
+    parser.addoption(
+        '--offline-payments', action='store_true', default=False,
+        help='answer payment-failure checkouts with canned responses instead of '
+             'sending them to the payment processor'
+    )
+
+
+@pytest.fixture(autouse=True)
+def offline_payments(request):
+    """
+    Stub payment failures when running with ``--offline-payments``.
+    
+    Only tests marked ``offline_payment`` are affected, and only their known
+    invalid, declined and expired test cards get a canned response; any other
+    checkout in those tests still goes to the real API.
+    """
+    if not (request.config.getoption('--offline-payments')
+            and request.node.get_closest_marker('offline_payment')):
+        yield
+        return
+    
+    submit_checkout = CheckoutHelper.submit_checkout
+    
+    def offline_submit_checkout(self, shipping_address, payment_info, checkout_endpoint='/checkout'):
+        canned = canned_payment_failure(payment_info)
+        if canned is not None:
+            return canned
+        return submit_checkout(self, shipping_address, payment_info, checkout_endpoint)
+    
+    with patch.object(CheckoutHelper, 'submit_checkout', offline_submit_checkout):
+        yield
+
+
+@pytest.fixture(scope="session")
+def test_data():
+    """Test data loaded once for the whole session."""
+    return TestDataLoader.load_test_data()
+
+
+@pytest.fixture(scope="session")
+def api_config(test_data):
+    """Base URL and endpoint paths, with defaults for any missing from the test data."""
+    endpoints = test_data.get('endpoints', {})
+    return ApiConfig(
+        base_url=test_data.get('base_url', 'https://api.ecommerce-demo.com'),
+        health_endpoint=endpoints.get('health', '/health'),
+        login_endpoint=endpoints.get('login', '/auth/login'),
+        profile_endpoint=endpoints.get('profile', '/users/profile'),
+        cart_endpoint=endpoints.get('cart', '/cart'),
+        cart_items_endpoint=endpoints.get('cart_items', '/cart/items'),
+        checkout_endpoint=endpoints.get('checkout', '/checkout'),
+        orders_endpoint=endpoints.get('orders', '/orders')
+    )
+
+
+@pytest.fixture(scope="session")
+def api_client(api_config):
+    """API client shared by all tests in the session."""
+    client = APIClient(api_config.base_url)
+    yield client
+    # The session is shared by every client of this base URL, so close all
+    # pools once at the end of the run rather than just this client's reference
+    APIClient.close_all_sessions()
+
+
+@pytest.fixture(scope="session")
+def warm_connection(api_client, api_config):
+    """
+    Open the first pooled connection before the live API tests run.
+    
+    The TCP/TLS handshake then happens during session setup instead of
+    inside whichever test happens to make the first request. Requested by
+    the live test classes (directly or through ``auth_token``) only, so
+    offline tests never touch the network.
+    """
+    url = f"{api_client.base_url}{api_config.health_endpoint}"
+    adapter = api_client.session.get_adapter(url)
+    # A single attempt, so warm-up never costs more than one timeout; the
+    # request still goes through the session (pool, proxies, verify)
+    max_retries, adapter.max_retries = adapter.max_retries, Retry(0, read=False)
+    try:
+        api_client.session.head(url, timeout=5)
+    except requests.exceptions.RequestException:
+        # Warm-up is best effort; tests report real connectivity problems
+        pass
+    finally:
+        adapter.max_retries = max_retries
+
+
+@pytest.fixture(scope="session")
+def auth_helper(api_client, api_config):
+    """Authentication helper bound to the shared API client."""
+    return AuthHelper(api_client, api_config.login_endpoint)
+
+
+@pytest.fixture(scope="session")
+def cart_helper(api_client):
+    """Cart helper bound to the shared API client."""
+    return CartHelper(api_client)
+
+
+@pytest.fixture(scope="session")
+def checkout_helper(api_client):
+    """Checkout helper bound to the shared API client."""
+    return CheckoutHelper(api_client)
+
+
+@pytest.fixture(scope="session")
+def standard_user(test_data):
+    """
+    Standard user account for this worker.
+    
+    Under pytest-xdist each worker picks its own entry from the optional
+    ``worker_users`` list so parallel workers do not share a cart. Without
+    that list every worker falls back to ``valid_users.standard_user``.
+    """
+    users = test_data.get('worker_users') or [test_data['valid_users']['standard_user']]
+    worker_id = os.environ.get('PYTEST_XDIST_WORKER', 'gw0')
+    return users[int(worker_id[2:]) % len(users)]
+
+
+@pytest.fixture(scope="session")
+def auth_token(auth_helper, standard_user, warm_connection):
+    """Log in once with the standard user and return the authentication token."""
+    success, response_data = auth_helper.login(standard_user['email'], standard_user['password'])
+    assert success, "Login should succeed before authenticated tests"
+    return response_data['token']
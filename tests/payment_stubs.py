@@ -0,0 +1,72 @@
+"""
+Payment payloads and canned backend answers for the payment-failure tests.
+The checkout tests submit these payloads, and the ``--offline-payments`` stub
+answers the failing ones without contacting the payment processor.
+"""
+
+import json
+
+import requests
+
+
+# Payment payloads shared by the payment scenarios
+TEST_CARD_PAYMENT = {
+    "card_number": "4111111111111111",
+    "expiry_month": "12",
+    "expiry_year": "2025",
+    "cvv": "123",
+    "cardholder_name": "John Doe"
+}
+EXPIRED_PAYMENT = {**TEST_CARD_PAYMENT, "expiry_year": "2020"}  # Expired year
+# Common test card for payment failure
+FAILING_PAYMENT = {**TEST_CARD_PAYMENT, "card_number": "4000000000000002"}
+
+# Invalid card numbers keyed on their test id
+INVALID_CARD_NUMBERS = {
+    "invalid_luhn": "1234567890123456",
+    "too_short": "411111111111111",
+    "too_long": "41111111111111111",
+    "contains_letters": "abcd1111efgh2222",
+    "empty": "",
+    "all_zeros": "0000000000000000"
+}
+
+# Canned backend answers, keyed on the exact card numbers the tests submit
+_INVALID_CARD_RESPONSE = (400, {'error': 'invalid_card', 'message': 'Invalid card number'})
+_CANNED_CARD_FAILURES = {
+    FAILING_PAYMENT['card_number']: (402, {'error': 'payment_declined',
+                                           'message': 'Payment declined by card issuer'}),
+    **dict.fromkeys(INVALID_CARD_NUMBERS.values(), _INVALID_CARD_RESPONSE)
+}
+# The expired-card test reuses a valid number, so it is keyed on
+# (card_number, expiry_month, expiry_year)
+_CANNED_EXPIRED_CARDS = {
+    (EXPIRED_PAYMENT['card_number'], EXPIRED_PAYMENT['expiry_month'],
+     EXPIRED_PAYMENT['expiry_year']): (400, {'error': 'invalid_card',
+                                             'message': 'Card has expired'})
+}
+
+
+def canned_response(status_code, body):
+    """Build a JSON ``requests.Response`` without touching the network."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(body).encode()
+    return response
+
+
+def canned_payment_failure(payment_info):
+    """
+    Return the canned backend response for a known payment-failure test card.
+    
+    Returns None for any other payment, so the checkout goes to the real API.
+    """
+    card_number = payment_info.get('card_number')
+    canned = _CANNED_CARD_FAILURES.get(card_number)
+    if canned is None:
+        expiry_key = (card_number, payment_info.get('expiry_month'), payment_info.get('expiry_year'))
+        canned = _CANNED_EXPIRED_CARDS.get(expiry_key)
+    if canned is None:
+        return None
+    return canned_response(*canned)
@@ -0,0 +1,141 @@
+"""
+Test cases for the API client and helper utilities.
+Covers auth header handling, JSON body encoding and log masking;
+these tests never contact the API.
+"""
+
+import json
+
+import pytest
+import requests
+from utils.api_helpers import APIClient, BearerAuth, _encode_json, mask_sensitive_data
+
+
+class _RecordingSession:
+    """Stands in for the shared requests session and records each request's arguments."""
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(kwargs)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+
+@pytest.fixture
+def recording_client():
+    """APIClient with a stored token whose requests are recorded instead of sent."""
+    client = APIClient('http://api.test.invalid')
+    client.session = _RecordingSession()
+    client.set_auth_token('stored-token')
+    return client
+
+
+class TestAPIClientAuth:
+    """Test class for how the stored token interacts with per-request auth."""
+
+    @pytest.mark.api
+    def test_stored_token_is_sent(self, recording_client):
+        """Test that the stored token is sent when the caller passes no auth."""
+        recording_client.get('/profile')
+
+        auth = recording_client.session.calls[-1]['auth']
+        assert isinstance(auth, BearerAuth), "Stored token should be sent as bearer auth"
+        assert auth.token == 'stored-token', "Bearer auth should carry the stored token"
+
+    @pytest.mark.api
+    @pytest.mark.parametrize("header_name", ["Authorization", "authorization"])
+    def test_authorization_header_overrides_token(self, recording_client, header_name):
+        """Test that an explicit Authorization header replaces the stored token."""
+        recording_client.get('/profile', headers={header_name: 'Bearer other-token'})
+
+        kwargs = recording_client.session.calls[-1]
+        assert 'auth' not in kwargs, "Explicit Authorization header should suppress the stored token"
+        assert kwargs['headers'][header_name] == 'Bearer other-token'
+
+    @pytest.mark.api
+    def test_authorization_none_drops_token(self, recording_client):
+        """Test that Authorization=None sends the request without any auth."""
+        recording_client.get('/profile', headers={'Authorization': None})
+
+        kwargs = recording_client.session.calls[-1]
+        assert 'auth' not in kwargs, "Authorization=None should suppress the stored token"
+        assert kwargs['headers']['Authorization'] is None
+
+    @pytest.mark.api
+    def test_temp_headers_authorization_overrides_token(self, recording_client):
+        """Test that an Authorization header set through temp_headers also wins."""
+        with recording_client.temp_headers(Authorization=None):
+            recording_client.get('/profile')
+        recording_client.get('/profile')
+
+        assert 'auth' not in recording_client.session.calls[0], \
+            "Temporary Authorization header should suppress the stored token"
+        assert 'auth' in recording_client.session.calls[1], \
+            "Stored token should be sent again once the override is gone"
+
+
+class TestJSONEncoding:
+    """Test class for request body encoding."""
+
+    @pytest.mark.api
+    def test_non_str_keys_are_encoded(self):
+        """Test that non-str dict keys are accepted, as with requests' json=."""
+        assert json.loads(_encode_json({1: 2})) == {"1": 2}
+
+    @pytest.mark.api
+    def test_wide_ints_are_encoded(self):
+        """Test that integers beyond 64 bits keep their exact value."""
+        assert json.loads(_encode_json({"id": 2 ** 70})) == {"id": 2 ** 70}
+
+    @pytest.mark.api
+    def test_nan_is_rejected(self):
+        """Test that NaN raises InvalidJSONError instead of being sent as null."""
+        with pytest.raises(requests.exceptions.InvalidJSONError):
+            _encode_json({"amount": float('nan')})
+
+    @pytest.mark.api
+    def test_explicit_data_wins_over_json(self, recording_client):
+        """Test that an explicit data= body is sent unchanged alongside json=."""
+        recording_client.post('/cart/items', data=b'raw', json={"ignored": True})
+
+        kwargs = recording_client.session.calls[-1]
+        assert kwargs['data'] == b'raw', "Explicit data= should take precedence over json="
+
+    @pytest.mark.api
+    def test_json_body_is_encoded_into_data(self, recording_client):
+        """Test that json= bodies are sent as encoded data."""
+        recording_client.post('/cart/items', json={"product_id": 1})
+
+        kwargs = recording_client.session.calls[-1]
+        assert 'json' not in kwargs, "json= should be replaced by the encoded body"
+        assert json.loads(kwargs['data']) == {"product_id": 1}
+
+
+class TestMaskSensitiveData:
+    """Test class for masking sensitive fields in logged data."""
+
+    @pytest.mark.api
+    def test_default_fields_are_masked(self):
+        """Test that the default sensitive fields are masked."""
+        masked = mask_sensitive_data({"email": "a@b.c", "password": "secret"})
+
+        assert masked == {"email": "a@b.c", "password": "******"}
+
+    @pytest.mark.api
+    def test_none_uses_default_fields(self):
+        """Test that sensitive_fields=None falls back to the default fields."""
+        data = {"email": "a@b.c", "password": "secret"}
+
+        assert mask_sensitive_data(data, None) == {"email": "a@b.c", "password": "******"}
+
+    @pytest.mark.api
+    def test_input_is_not_modified(self):
+        """Test that masking returns a copy and leaves the input untouched."""
+        data = {"password": "secret"}
+
+        mask_sensitive_data(data)
+
+        assert data == {"password": "secret"}, "Input data should not be modified"
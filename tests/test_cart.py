@@ -4,49 +4,49 @@ Covers positive, negative, and boundary test scenarios for cart operations.
 """
 
 import pytest
-import time
-from faker import Faker
-from utils.api_helpers import (
-    APIClient, AuthHelper, CartHelper, ResponseValidator, 
-    TestDataLoader, setup_logging
-)
+from utils.api_helpers import ResponseValidator, cached_json, setup_logging
 
 
 # Setup logging for tests
 setup_logging()
 
-# Initialize Faker for generating test data
-fake = Faker()
-
 
 class TestCart:
     """Test class for shopping cart functionality."""
     
-    @classmethod
-    def setup_class(cls):
-        """Setup test class with common test data and API client."""
-        cls.test_data = TestDataLoader.load_test_data()
-        cls.base_url = cls.test_data.get('base_url', 'https://api.ecommerce-demo.com')
-        cls.api_client = APIClient(cls.base_url)
-        cls.auth_helper = AuthHelper(cls.api_client)
-        cls.cart_helper = CartHelper(cls.api_client)
-        
+    @pytest.fixture(scope="class", autouse=True)
+    def class_fixtures(self, request, test_data, api_config, standard_user, api_client,
+                       auth_helper, cart_helper, auth_token):
+        """Bind the session-scoped test data, API client and helpers to the test class."""
+        cls = request.cls
+        cls.test_data = test_data
+        cls.user_data = standard_user
+        cls.api_client = api_client
+        cls.auth_helper = auth_helper
+        cls.cart_helper = cart_helper
+
         # Endpoints
-        cls.cart_endpoint = cls.test_data.get('endpoints', {}).get('cart', '/cart')
-        cls.cart_items_endpoint = cls.test_data.get('endpoints', {}).get('cart_items', '/cart/items')
+        cls.cart_endpoint = api_config.cart_endpoint
+        cls.cart_items_endpoint = api_config.cart_items_endpoint
 
-    def setup_method(self):
-        """Setup method run before each test - login and clear cart."""
-        # Login with standard user
-        user_data = self.test_data['valid_users']['standard_user']
-        success, _ = self.auth_helper.login(user_data['email'], user_data['password'])
-        assert success, "Login should succeed before cart tests"
-        
-        # Clear cart to start with clean state
-        self.cart_helper.clear_cart(self.cart_endpoint)
+        # Frequently used products and scenarios
+        products = cls.test_data['products']
+        cls.laptop = products['laptop']
+        cls.smartphone = products['smartphone']
+        cls.book = products['book']
+        cls.out_of_stock = products['out_of_stock']
+        cls.cart_scenarios = cls.test_data['cart_scenarios']
+
+        # Start the class with a clean cart; each test clears up after itself
+        api_client.set_auth_token(auth_token)
+        cart_helper.clear_cart(cls.cart_endpoint)
 
-    def teardown_method(self):
-        """Cleanup method run after each test."""
+    @pytest.fixture(autouse=True)
+    def clean_cart(self, auth_token):
+        """Restore the session login before each test and clear the cart after it."""
+        # Reuse the session login instead of logging in again
+        self.api_client.set_auth_token(auth_token)
+        yield
         # Clear cart after test
         self.cart_helper.clear_cart(self.cart_endpoint)
 
@@ -56,8 +56,8 @@ class TestCart:
     def test_add_item_to_cart(self):
         """Test adding a valid item to cart."""
         # Test data
-        product = self.test_data['products']['laptop']
-        cart_data = self.test_data['cart_scenarios']['valid_item']
+        product = self.laptop
+        cart_data = self.cart_scenarios['valid_item']
         
         # Add item to cart
         response = self.cart_helper.add_item_to_cart(
@@ -70,7 +70,7 @@ class TestCart:
         assert response.status_code in [200, 201], "Adding item to cart should succeed"
         assert ResponseValidator.validate_json_response(response), "Response should be valid JSON"
         
-        response_data = response.json()
+        response_data = cached_json(response)
         assert 'item' in response_data or 'product_id' in response_data, \
             "Response should contain item information"
 
@@ -79,18 +79,17 @@ class TestCart:
     def test_add_multiple_items_to_cart(self):
         """Test adding multiple different items to cart."""
         products = [
-            (self.test_data['products']['laptop'], 1),
-            (self.test_data['products']['smartphone'], 2),
-            (self.test_data['products']['book'], 3)
+            (self.laptop, 1),
+            (self.smartphone, 2),
+            (self.book, 3)
         ]
         
-        # Add multiple items
-        for product, quantity in products:
-            response = self.cart_helper.add_item_to_cart(
-                product['id'], 
-                quantity,
-                self.cart_items_endpoint
-            )
+        # Add multiple items concurrently
+        responses = self.cart_helper.add_items_to_cart(
+            [(product['id'], quantity) for product, quantity in products],
+            self.cart_items_endpoint
+        )
+        for (product, _), response in zip(products, responses):
             assert response.status_code in [200, 201], \
                 f"Adding {product['name']} should succeed"
         
@@ -98,7 +97,7 @@ class TestCart:
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
         assert cart_response.status_code == 200, "Getting cart contents should succeed"
         
-        cart_data = cart_response.json()
+        cart_data = cached_json(cart_response)
         assert 'items' in cart_data, "Cart should contain items"
         assert len(cart_data['items']) == len(products), \
             f"Cart should contain {len(products)} different items"
@@ -108,7 +107,7 @@ class TestCart:
     def test_update_cart_item_quantity(self):
         """Test updating quantity of item in cart."""
         # First add an item
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         initial_quantity = 1
         
         add_response = self.cart_helper.add_item_to_cart(
@@ -131,13 +130,9 @@ class TestCart:
         
         # Verify updated quantity
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
-        cart_data = cart_response.json()
+        cart_data = cached_json(cart_response)
         
-        updated_item = None
-        for item in cart_data.get('items', []):
-            if item.get('product_id') == product['id']:
-                updated_item = item
-                break
+        updated_item = ResponseValidator.index_cart_items(cart_data).get(product['id'])
         
         assert updated_item is not None, "Updated item should be found in cart"
         assert updated_item.get('quantity') == new_quantity, \
@@ -148,7 +143,7 @@ class TestCart:
     def test_remove_item_from_cart(self):
         """Test removing an item from cart."""
         # First add an item
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         
         add_response = self.cart_helper.add_item_to_cart(
             product['id'], 
@@ -168,11 +163,10 @@ class TestCart:
         
         # Verify item is removed
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
-        cart_data = cart_response.json()
+        cart_data = cached_json(cart_response)
         
-        items = cart_data.get('items', [])
-        item_exists = any(item.get('product_id') == product['id'] for item in items)
-        assert not item_exists, "Removed item should not be in cart"
+        cart_items = ResponseValidator.index_cart_items(cart_data)
+        assert product['id'] not in cart_items, "Removed item should not be in cart"
 
     @pytest.mark.cart
     @pytest.mark.positive
@@ -180,16 +174,15 @@ class TestCart:
         """Test clearing all items from cart."""
         # Add multiple items first
         products = [
-            self.test_data['products']['laptop'],
-            self.test_data['products']['smartphone']
+            self.laptop,
+            self.smartphone
         ]
         
-        for product in products:
-            response = self.cart_helper.add_item_to_cart(
-                product['id'], 
-                1,
-                self.cart_items_endpoint
-            )
+        responses = self.cart_helper.add_items_to_cart(
+            [(product['id'], 1) for product in products],
+            self.cart_items_endpoint
+        )
+        for product, response in zip(products, responses):
             assert response.status_code in [200, 201], f"Adding {product['name']} should succeed"
         
         # Clear cart
@@ -198,7 +191,7 @@ class TestCart:
         
         # Verify cart is empty
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
-        cart_data = cart_response.json()
+        cart_data = cached_json(cart_response)
         
         items = cart_data.get('items', [])
         assert len(items) == 0, "Cart should be empty after clearing"
@@ -208,7 +201,7 @@ class TestCart:
     def test_get_cart_contents(self):
         """Test retrieving cart contents."""
         # Add an item first
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         quantity = 2
         
         self.cart_helper.add_item_to_cart(
@@ -224,7 +217,7 @@ class TestCart:
         assert response.status_code == 200, "Getting cart contents should succeed"
         assert ResponseValidator.validate_json_response(response), "Response should be valid JSON"
         
-        cart_data = response.json()
+        cart_data = cached_json(response)
         required_fields = ['items', 'total']
         assert ResponseValidator.validate_response_schema(response, required_fields), \
             f"Cart response should contain: {required_fields}"
@@ -241,7 +234,7 @@ class TestCart:
     @pytest.mark.negative
     def test_add_invalid_product_to_cart(self):
         """Test adding non-existent product to cart."""
-        invalid_scenario = self.test_data['cart_scenarios']['invalid_product_id']
+        invalid_scenario = self.cart_scenarios['invalid_product_id']
         
         response = self.cart_helper.add_item_to_cart(
             invalid_scenario['product_id'], 
@@ -259,7 +252,7 @@ class TestCart:
     @pytest.mark.negative
     def test_add_zero_quantity_to_cart(self):
         """Test adding item with zero quantity."""
-        zero_scenario = self.test_data['cart_scenarios']['zero_quantity']
+        zero_scenario = self.cart_scenarios['zero_quantity']
         
         response = self.cart_helper.add_item_to_cart(
             zero_scenario['product_id'], 
@@ -277,7 +270,7 @@ class TestCart:
     @pytest.mark.negative
     def test_add_negative_quantity_to_cart(self):
         """Test adding item with negative quantity."""
-        negative_scenario = self.test_data['cart_scenarios']['negative_quantity']
+        negative_scenario = self.cart_scenarios['negative_quantity']
         
         response = self.cart_helper.add_item_to_cart(
             negative_scenario['product_id'], 
@@ -296,7 +289,7 @@ class TestCart:
     def test_add_maximum_quantity_to_cart(self):
         """Test adding item with maximum allowed quantity."""
         max_quantity = self.test_data['test_boundaries']['max_cart_quantity']
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         
         response = self.cart_helper.add_item_to_cart(
             product['id'], 
@@ -308,13 +301,9 @@ class TestCart:
         if response.status_code in [200, 201]:
             # If successful, verify quantity
             cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
-            cart_data = cart_response.json()
+            cart_data = cached_json(cart_response)
             
-            cart_item = None
-            for item in cart_data.get('items', []):
-                if item.get('product_id') == product['id']:
-                    cart_item = item
-                    break
+            cart_item = ResponseValidator.index_cart_items(cart_data).get(product['id'])
             
             assert cart_item is not None, "Item should be in cart"
             assert cart_item['quantity'] <= max_quantity, \
@@ -328,7 +317,7 @@ class TestCart:
     @pytest.mark.boundary
     def test_add_large_quantity_to_cart(self):
         """Test adding item with very large quantity."""
-        large_scenario = self.test_data['cart_scenarios']['large_quantity']
+        large_scenario = self.cart_scenarios['large_quantity']
         
         response = self.cart_helper.add_item_to_cart(
             large_scenario['product_id'], 
@@ -348,7 +337,7 @@ class TestCart:
     @pytest.mark.negative
     def test_add_out_of_stock_item(self):
         """Test adding out of stock item to cart."""
-        out_of_stock = self.test_data['products']['out_of_stock']
+        out_of_stock = self.out_of_stock
         
         response = self.cart_helper.add_item_to_cart(
             out_of_stock['id'], 
@@ -361,8 +350,8 @@ class TestCart:
             assert ResponseValidator.validate_error_response(response), \
                 "Out of stock error should be properly formatted"
             
-            response_data = response.json()
-            error_message = response_data.get('error', '') + response_data.get('message', '')
+            response_data = cached_json(response)
+            error_message = ResponseValidator.combined_error(response_data)
             assert 'stock' in error_message.lower() or 'available' in error_message.lower(), \
                 "Error message should indicate stock issue"
 
@@ -406,7 +395,7 @@ class TestCart:
         # Clear authentication
         self.api_client.clear_auth_token()
         
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         
         # Try to add item without auth
         response = self.cart_helper.add_item_to_cart(
@@ -427,22 +416,19 @@ class TestCart:
         """Test that cart total is calculated correctly."""
         # Add items with known prices
         items_to_add = [
-            (self.test_data['products']['laptop'], 2),  # 1299.99 * 2 = 2599.98
-            (self.test_data['products']['book'], 1)     # 39.99 * 1 = 39.99
+            (self.laptop, 2),  # 1299.99 * 2 = 2599.98
+            (self.book, 1)     # 39.99 * 1 = 39.99
         ]
         
-        expected_total = 0
-        for product, quantity in items_to_add:
-            self.cart_helper.add_item_to_cart(
-                product['id'], 
-                quantity,
-                self.cart_items_endpoint
-            )
-            expected_total += product['price'] * quantity
+        self.cart_helper.add_items_to_cart(
+            [(product['id'], quantity) for product, quantity in items_to_add],
+            self.cart_items_endpoint
+        )
+        expected_total = sum(product['price'] * quantity for product, quantity in items_to_add)
         
         # Get cart and verify total
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
-        cart_data = cart_response.json()
+        cart_data = cached_json(cart_response)
         
         actual_total = cart_data.get('total', 0)
         
@@ -454,7 +440,7 @@ class TestCart:
     @pytest.mark.positive
     def test_add_same_item_multiple_times(self):
         """Test adding the same item multiple times (should update quantity)."""
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         
         # Add item first time
         response1 = self.cart_helper.add_item_to_cart(
@@ -474,7 +460,7 @@ class TestCart:
         
         # Verify final quantity
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
-        cart_data = cart_response.json()
+        cart_data = cached_json(cart_response)
         
         items = cart_data.get('items', [])
         laptop_items = [item for item in items if item.get('product_id') == product['id']]
@@ -492,8 +478,8 @@ class TestCart:
     @pytest.mark.regression
     def test_cart_persistence_across_sessions(self):
         """Test that cart persists across login sessions."""
-        product = self.test_data['products']['laptop']
-        user_data = self.test_data['valid_users']['standard_user']
+        product = self.laptop
+        user_data = self.user_data
         
         # Add item to cart
         add_response = self.cart_helper.add_item_to_cart(
@@ -503,10 +489,11 @@ class TestCart:
         )
         assert add_response.status_code in [200, 201], "Adding item should succeed"
         
-        # Logout
-        self.auth_helper.logout()
+        # Drop the client-side session only; a server-side logout would also
+        # revoke the shared session token used by the other tests
+        self.api_client.clear_auth_token()
         
-        # Login again
+        # Login again to start a new session
         login_success, _ = self.auth_helper.login(user_data['email'], user_data['password'])
         assert login_success, "Re-login should succeed"
         
@@ -514,38 +501,38 @@ class TestCart:
         cart_response = self.cart_helper.get_cart_contents(self.cart_endpoint)
         
         if cart_response.status_code == 200:
-            cart_data = cart_response.json()
+            cart_data = cached_json(cart_response)
             items = cart_data.get('items', [])
             
             # Cart may or may not persist depending on implementation
             # Document the expected behavior
             if items:
                 # Cart persisted
-                laptop_item = next((item for item in items 
-                                  if item.get('product_id') == product['id']), None)
+                laptop_item = ResponseValidator.index_cart_items(cart_data).get(product['id'])
                 if laptop_item:
                     assert laptop_item['quantity'] == 2, \
                         "Cart item quantity should persist across sessions"
 
     @pytest.mark.cart
     @pytest.mark.negative
-    def test_malformed_cart_requests(self):
-        """Test cart API with malformed requests."""
-        malformed_payloads = [
-            {},  # Empty payload
-            {"product_id": "invalid"},  # Invalid product ID type
-            {"quantity": "invalid"},    # Invalid quantity type
-            {"product_id": 1},         # Missing quantity
-            {"quantity": 1},           # Missing product ID
-            {"product_id": None, "quantity": 1},  # Null product ID
-            {"product_id": 1, "quantity": None}   # Null quantity
-        ]
-        
-        for payload in malformed_payloads:
-            response = self.api_client.post(self.cart_items_endpoint, json=payload)
-            
-            # Should return bad request for malformed data
-            assert response.status_code == 400, \
-                f"Malformed payload should return 400: {payload}"
-            assert ResponseValidator.validate_error_response(response), \
-                f"Error response should be properly formatted for payload: {payload}"
+    @pytest.mark.parametrize("payload", [
+        {},  # Empty payload
+        {"product_id": "invalid"},  # Invalid product ID type
+        {"quantity": "invalid"},    # Invalid quantity type
+        {"product_id": 1},         # Missing quantity
+        {"quantity": 1},           # Missing product ID
+        {"product_id": None, "quantity": 1},  # Null product ID
+        {"product_id": 1, "quantity": None}   # Null quantity
+    ], ids=[
+        "empty", "invalid_product_id_type", "invalid_quantity_type", "missing_quantity",
+        "missing_product_id", "null_product_id", "null_quantity"
+    ])
+    def test_malformed_cart_request(self, payload):
+        """Test cart API with a malformed request."""
+        response = self.api_client.post(self.cart_items_endpoint, json=payload)
+        
+        # Should return bad request for malformed data
+        assert response.status_code == 400, \
+            f"Malformed payload should return 400: {payload}"
+        assert ResponseValidator.validate_error_response(response), \
+            f"Error response should be properly formatted for payload: {payload}"
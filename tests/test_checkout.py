@@ -3,52 +3,102 @@ Test cases for checkout functionality.
 Covers positive, negative, and boundary test scenarios for the checkout process.
 """
 
+import functools
+import re
 import pytest
-import time
-from faker import Faker
-from utils.api_helpers import (
-    APIClient, AuthHelper, CartHelper, CheckoutHelper, ResponseValidator, 
-    TestDataLoader, setup_logging
+from tests.payment_stubs import (
+    EXPIRED_PAYMENT, FAILING_PAYMENT, INVALID_CARD_NUMBERS, TEST_CARD_PAYMENT
 )
+from utils.api_helpers import ResponseValidator, cached_json, run_concurrently, setup_logging
 
 
 # Setup logging for tests
 setup_logging()
 
-# Initialize Faker for generating test data
-fake = Faker()
+# Case-insensitive keyword checks for error messages
+_PAYMENT_ERR_RE = re.compile(r'payment|card|invalid', re.I)
+_STOCK_ERR_RE = re.compile(r'stock|available', re.I)
+_PAYMENT_FAIL_RE = re.compile(r'payment|declined|failed', re.I)
+
+_INVALID_CARD_NUMBERS = tuple(
+    pytest.param(card_number, id=card_id) for card_id, card_number in INVALID_CARD_NUMBERS.items()
+)
+# Min/max values; the invalid lengths are rejected before the cart is read,
+# while valid CVVs may complete checkout and need the prepared cart
+_BOUNDARY_CVVS = (
+    pytest.param("000", id="cvv_000"),
+    pytest.param("999", id="cvv_999"),
+    pytest.param("12", id="cvv_12", marks=pytest.mark.no_cart_setup),
+    pytest.param("1234", id="cvv_1234", marks=pytest.mark.no_cart_setup)
+)
+
+_INVALID_ADDRESSES = (
+    pytest.param({}, id="empty_address"),
+    pytest.param({"street": ""}, id="empty_street"),
+    pytest.param({"street": "123 Main St"}, id="missing_fields"),
+    pytest.param({"street": "123 Main St", "city": "", "state": "CA", "zip_code": "12345"},
+                 id="empty_city"),
+    pytest.param({"street": "123 Main St", "city": "City", "state": "", "zip_code": "12345"},
+                 id="empty_state"),
+    pytest.param({"street": "123 Main St", "city": "City", "state": "CA", "zip_code": ""},
+                 id="empty_zip")
+)
 
 
 class TestCheckout:
     """Test class for checkout functionality."""
     
-    @classmethod
-    def setup_class(cls):
-        """Setup test class with common test data and API client."""
-        cls.test_data = TestDataLoader.load_test_data()
-        cls.base_url = cls.test_data.get('base_url', 'https://api.ecommerce-demo.com')
-        cls.api_client = APIClient(cls.base_url)
-        cls.auth_helper = AuthHelper(cls.api_client)
-        cls.cart_helper = CartHelper(cls.api_client)
-        cls.checkout_helper = CheckoutHelper(cls.api_client)
-        
+    @pytest.fixture(scope="class", autouse=True)
+    def class_fixtures(self, request, test_data, api_config, api_client, cart_helper,
+                       checkout_helper, auth_token):
+        """Bind the session-scoped test data, API client and helpers to the test class."""
+        cls = request.cls
+        cls.test_data = test_data
+        cls.api_client = api_client
+        cls.cart_helper = cart_helper
+        cls.checkout_helper = checkout_helper
+
         # Endpoints
-        cls.checkout_endpoint = cls.test_data.get('endpoints', {}).get('checkout', '/checkout')
-        cls.orders_endpoint = cls.test_data.get('endpoints', {}).get('orders', '/orders')
-        cls.cart_items_endpoint = cls.test_data.get('endpoints', {}).get('cart_items', '/cart/items')
+        cls.checkout_endpoint = api_config.checkout_endpoint
+        cls.orders_endpoint = api_config.orders_endpoint
+        cls.cart_items_endpoint = api_config.cart_items_endpoint
+
+        # Frequently used products and checkout data
+        products = cls.test_data['products']
+        cls.laptop = products['laptop']
+        cls.smartphone = products['smartphone']
+        cls.book = products['book']
+        cls.out_of_stock = products['out_of_stock']
+        checkout_data = cls.test_data['checkout_data']
+        cls.valid_address = checkout_data['valid_address']
+        cls.valid_payment = checkout_data['valid_payment']
+        cls.invalid_payment = checkout_data['invalid_payment']
+        yield
+        # Leave an empty cart behind for other test classes
+        api_client.set_auth_token(auth_token)
+        cart_helper.clear_cart()
+
+    @pytest.fixture(autouse=True)
+    def fresh_cart(self, request, auth_token):
+        """
+        Restore the session login and prepare a cart with one item for checkout.
+        
+        The cart is reset before each test rather than after it, since the
+        next test's reset makes an extra clear redundant. Tests marked
+        ``no_cart_setup`` are rejected before the cart is read, so they
+        skip the cart preparation.
+        """
+        # Reuse the session login instead of logging in again
+        self.api_client.set_auth_token(auth_token)
+
+        if request.node.get_closest_marker('no_cart_setup'):
+            return
 
-    def setup_method(self):
-        """Setup method run before each test - login and prepare cart."""
-        # Login with standard user
-        user_data = self.test_data['valid_users']['standard_user']
-        success, _ = self.auth_helper.login(user_data['email'], user_data['password'])
-        assert success, "Login should succeed before checkout tests"
-        
         # Clear cart and add test items
         self.cart_helper.clear_cart()
-        
+
         # Add a standard item for checkout
-        product = self.test_data['products']['laptop']
+        product = self.laptop
         add_response = self.cart_helper.add_item_to_cart(
             product['id'], 
             1,
@@ -56,11 +106,6 @@ class TestCheckout:
         )
         assert add_response.status_code in [200, 201], "Adding item for checkout should succeed"
 
-    def teardown_method(self):
-        """Cleanup method run after each test."""
-        # Clear cart after test
-        self.cart_helper.clear_cart()
-
     @pytest.mark.smoke
     @pytest.mark.checkout
     @pytest.mark.positive
@@ -72,7 +117,7 @@ class TestCheckout:
         assert response.status_code in [200, 201], "Checkout initiation should succeed"
         assert ResponseValidator.validate_json_response(response), "Response should be valid JSON"
         
-        response_data = response.json()
+        response_data = cached_json(response)
         expected_fields = ['checkout_id', 'total', 'items']
         
         for field in expected_fields:
@@ -84,14 +129,10 @@ class TestCheckout:
     def test_complete_checkout_valid_data(self):
         """Test completing checkout with valid shipping and payment data."""
         # Get test data
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
-        # Initiate checkout first
-        init_response = self.checkout_helper.initiate_checkout(self.checkout_endpoint)
-        assert init_response.status_code in [200, 201], "Checkout initiation should succeed"
-        
-        # Complete checkout
+        # Complete checkout (initiation is covered by test_initiate_checkout)
         submit_response = self.checkout_helper.submit_checkout(
             shipping_address, 
             payment_info, 
@@ -103,7 +144,7 @@ class TestCheckout:
         assert ResponseValidator.validate_json_response(submit_response), \
             "Checkout response should be valid JSON"
         
-        response_data = submit_response.json()
+        response_data = cached_json(submit_response)
         required_fields = ['order_id', 'status', 'total']
         assert ResponseValidator.validate_response_schema(submit_response, required_fields), \
             f"Checkout response should contain: {required_fields}"
@@ -120,21 +161,20 @@ class TestCheckout:
         """Test checkout with multiple items in cart."""
         # Add additional items to cart
         additional_products = [
-            (self.test_data['products']['smartphone'], 1),
-            (self.test_data['products']['book'], 2)
+            (self.smartphone, 1),
+            (self.book, 2)
         ]
         
-        for product, quantity in additional_products:
-            response = self.cart_helper.add_item_to_cart(
-                product['id'], 
-                quantity,
-                self.cart_items_endpoint
-            )
+        responses = self.cart_helper.add_items_to_cart(
+            [(product['id'], quantity) for product, quantity in additional_products],
+            self.cart_items_endpoint
+        )
+        for (product, _), response in zip(additional_products, responses):
             assert response.status_code in [200, 201], f"Adding {product['name']} should succeed"
         
         # Get test data
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
         # Complete checkout
         submit_response = self.checkout_helper.submit_checkout(
@@ -147,14 +187,11 @@ class TestCheckout:
         assert submit_response.status_code in [200, 201], \
             "Multi-item checkout should succeed"
         
-        response_data = submit_response.json()
+        response_data = cached_json(submit_response)
         
-        # Verify total reflects multiple items
-        expected_total = (
-            self.test_data['products']['laptop']['price'] * 1 +
-            self.test_data['products']['smartphone']['price'] * 1 +
-            self.test_data['products']['book']['price'] * 2
-        )
+        # Verify total reflects multiple items (laptop added by fresh_cart)
+        cart_contents = [(self.laptop, 1)] + additional_products
+        expected_total = sum(product['price'] * quantity for product, quantity in cart_contents)
         
         actual_total = response_data.get('total', 0)
         assert abs(actual_total - expected_total) < 0.01, \
@@ -178,38 +215,31 @@ class TestCheckout:
 
     @pytest.mark.checkout
     @pytest.mark.negative
-    def test_checkout_invalid_shipping_address(self):
+    @pytest.mark.no_cart_setup
+    @pytest.mark.parametrize("invalid_address", _INVALID_ADDRESSES)
+    def test_checkout_invalid_shipping_address(self, invalid_address):
         """Test checkout with invalid shipping address."""
-        invalid_addresses = [
-            {},  # Empty address
-            {"street": ""},  # Empty street
-            {"street": "123 Main St"},  # Missing required fields
-            {"street": "123 Main St", "city": "", "state": "CA", "zip_code": "12345"},  # Empty city
-            {"street": "123 Main St", "city": "City", "state": "", "zip_code": "12345"},  # Empty state
-            {"street": "123 Main St", "city": "City", "state": "CA", "zip_code": ""},  # Empty zip
-        ]
+        payment_info = self.valid_payment
         
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        response = self.checkout_helper.submit_checkout(
+            invalid_address, 
+            payment_info, 
+            self.checkout_endpoint
+        )
         
-        for invalid_address in invalid_addresses:
-            response = self.checkout_helper.submit_checkout(
-                invalid_address, 
-                payment_info, 
-                self.checkout_endpoint
-            )
-            
-            # Should reject invalid address
-            assert response.status_code == 400, \
-                f"Invalid address should be rejected: {invalid_address}"
-            assert ResponseValidator.validate_error_response(response), \
-                f"Error response should be formatted for address: {invalid_address}"
+        # Should reject invalid address
+        assert response.status_code == 400, \
+            f"Invalid address should be rejected: {invalid_address}"
+        assert ResponseValidator.validate_error_response(response), \
+            f"Error response should be formatted for address: {invalid_address}"
 
     @pytest.mark.checkout
     @pytest.mark.negative
+    @pytest.mark.no_cart_setup
     def test_checkout_invalid_payment_info(self):
         """Test checkout with invalid payment information."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        invalid_payment = self.test_data['checkout_data']['invalid_payment']
+        shipping_address = self.valid_address
+        invalid_payment = self.invalid_payment
         
         response = self.checkout_helper.submit_checkout(
             shipping_address, 
@@ -222,30 +252,22 @@ class TestCheckout:
         assert ResponseValidator.validate_error_response(response), \
             "Error response should be properly formatted"
         
-        response_data = response.json()
-        error_message = response_data.get('error', '') + response_data.get('message', '')
-        assert any(keyword in error_message.lower() for keyword in 
-                  ['payment', 'card', 'invalid']), \
+        response_data = cached_json(response)
+        error_message = ResponseValidator.combined_error(response_data)
+        assert _PAYMENT_ERR_RE.search(error_message), \
             "Error message should indicate payment issue"
 
     @pytest.mark.checkout
     @pytest.mark.negative
+    @pytest.mark.no_cart_setup
+    @pytest.mark.offline_payment
     def test_checkout_expired_card(self):
         """Test checkout with expired credit card."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        
-        # Create expired card data
-        expired_payment = {
-            "card_number": "4111111111111111",
-            "expiry_month": "12",
-            "expiry_year": "2020",  # Expired year
-            "cvv": "123",
-            "cardholder_name": "John Doe"
-        }
+        shipping_address = self.valid_address
         
         response = self.checkout_helper.submit_checkout(
             shipping_address, 
-            expired_payment, 
+            EXPIRED_PAYMENT, 
             self.checkout_endpoint
         )
         
@@ -256,79 +278,56 @@ class TestCheckout:
 
     @pytest.mark.checkout
     @pytest.mark.negative
-    def test_checkout_invalid_card_number(self):
+    @pytest.mark.no_cart_setup
+    @pytest.mark.offline_payment
+    @pytest.mark.parametrize("invalid_card", _INVALID_CARD_NUMBERS)
+    def test_checkout_invalid_card_number(self, invalid_card):
         """Test checkout with invalid credit card number."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        
-        invalid_card_numbers = [
-            "1234567890123456",  # Invalid Luhn
-            "411111111111111",   # Too short
-            "41111111111111111", # Too long
-            "abcd1111efgh2222",  # Contains letters
-            "",                  # Empty
-            "0000000000000000"   # All zeros
-        ]
+        shipping_address = self.valid_address
+        invalid_payment = {**TEST_CARD_PAYMENT, "card_number": invalid_card}
         
-        for invalid_card in invalid_card_numbers:
-            invalid_payment = {
-                "card_number": invalid_card,
-                "expiry_month": "12",
-                "expiry_year": "2025",
-                "cvv": "123",
-                "cardholder_name": "John Doe"
-            }
-            
-            response = self.checkout_helper.submit_checkout(
-                shipping_address, 
-                invalid_payment, 
-                self.checkout_endpoint
-            )
-            
-            # Should reject invalid card number
-            assert response.status_code == 400, \
-                f"Invalid card number should be rejected: {invalid_card}"
+        response = self.checkout_helper.submit_checkout(
+            shipping_address, 
+            invalid_payment, 
+            self.checkout_endpoint
+        )
+        
+        # Should reject invalid card number
+        assert response.status_code == 400, \
+            f"Invalid card number should be rejected: {invalid_card}"
 
     @pytest.mark.checkout
     @pytest.mark.boundary
-    def test_checkout_boundary_values(self):
-        """Test checkout with boundary values."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        
-        # Test boundary CVV values
-        boundary_cvvs = ["000", "999", "12", "1234"]  # Min/max values
-        
-        for cvv in boundary_cvvs:
-            payment_info = {
-                "card_number": "4111111111111111",
-                "expiry_month": "12",
-                "expiry_year": "2025",
-                "cvv": cvv,
-                "cardholder_name": "John Doe"
-            }
-            
-            response = self.checkout_helper.submit_checkout(
-                shipping_address, 
-                payment_info, 
-                self.checkout_endpoint
-            )
-            
-            # Should handle boundary CVV values appropriately
-            if len(cvv) == 3:  # Valid CVV length
-                assert response.status_code in [200, 201, 400], \
-                    f"CVV {cvv} should be handled appropriately"
-            else:  # Invalid CVV length
-                assert response.status_code == 400, \
-                    f"Invalid CVV length {cvv} should be rejected"
+    @pytest.mark.parametrize("cvv", _BOUNDARY_CVVS)
+    def test_checkout_boundary_values(self, cvv):
+        """Test checkout with boundary CVV values."""
+        shipping_address = self.valid_address
+        payment_info = {**TEST_CARD_PAYMENT, "cvv": cvv}
+        
+        response = self.checkout_helper.submit_checkout(
+            shipping_address, 
+            payment_info, 
+            self.checkout_endpoint
+        )
+        
+        # Should handle boundary CVV values appropriately
+        if len(cvv) == 3:  # Valid CVV length
+            assert response.status_code in [200, 201, 400], \
+                f"CVV {cvv} should be handled appropriately"
+        else:  # Invalid CVV length
+            assert response.status_code == 400, \
+                f"Invalid CVV length {cvv} should be rejected"
 
     @pytest.mark.checkout
     @pytest.mark.negative
+    @pytest.mark.no_cart_setup
     def test_checkout_without_authentication(self):
         """Test checkout without authentication."""
         # Clear authentication
         self.api_client.clear_auth_token()
         
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
         # Try to checkout without auth
         response = self.checkout_helper.submit_checkout(
@@ -349,7 +348,7 @@ class TestCheckout:
         # Clear cart and add out of stock item
         self.cart_helper.clear_cart()
         
-        out_of_stock_product = self.test_data['products']['out_of_stock']
+        out_of_stock_product = self.out_of_stock
         
         # Try to add out of stock item (might succeed depending on implementation)
         add_response = self.cart_helper.add_item_to_cart(
@@ -360,8 +359,8 @@ class TestCheckout:
         
         # If item was added to cart, checkout should detect stock issue
         if add_response.status_code in [200, 201]:
-            shipping_address = self.test_data['checkout_data']['valid_address']
-            payment_info = self.test_data['checkout_data']['valid_payment']
+            shipping_address = self.valid_address
+            payment_info = self.valid_payment
             
             response = self.checkout_helper.submit_checkout(
                 shipping_address, 
@@ -373,9 +372,9 @@ class TestCheckout:
             assert response.status_code in [400, 409], \
                 "Checkout should detect insufficient stock"
             
-            response_data = response.json()
-            error_message = response_data.get('error', '') + response_data.get('message', '')
-            assert 'stock' in error_message.lower() or 'available' in error_message.lower(), \
+            response_data = cached_json(response)
+            error_message = ResponseValidator.combined_error(response_data)
+            assert _STOCK_ERR_RE.search(error_message), \
                 "Error should indicate stock issue"
 
     @pytest.mark.checkout
@@ -383,10 +382,10 @@ class TestCheckout:
     def test_checkout_tax_calculation(self):
         """Test that taxes are calculated correctly during checkout."""
         # Add items with known prices
-        laptop = self.test_data['products']['laptop']
+        laptop = self.laptop
         
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
         # Complete checkout
         response = self.checkout_helper.submit_checkout(
@@ -396,7 +395,7 @@ class TestCheckout:
         )
         
         if response.status_code in [200, 201]:
-            response_data = response.json()
+            response_data = cached_json(response)
             
             # Check if tax information is included
             if 'tax' in response_data:
@@ -418,8 +417,8 @@ class TestCheckout:
     @pytest.mark.regression
     def test_checkout_shipping_calculation(self):
         """Test that shipping costs are calculated correctly."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
         response = self.checkout_helper.submit_checkout(
             shipping_address, 
@@ -428,7 +427,7 @@ class TestCheckout:
         )
         
         if response.status_code in [200, 201]:
-            response_data = response.json()
+            response_data = cached_json(response)
             
             # Check if shipping information is included
             if 'shipping' in response_data:
@@ -444,8 +443,8 @@ class TestCheckout:
     @pytest.mark.positive
     def test_checkout_order_confirmation(self):
         """Test that order confirmation contains all necessary information."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
         response = self.checkout_helper.submit_checkout(
             shipping_address, 
@@ -454,7 +453,7 @@ class TestCheckout:
         )
         
         if response.status_code in [200, 201]:
-            response_data = response.json()
+            response_data = cached_json(response)
             
             # Verify order confirmation structure
             required_fields = ['order_id', 'status', 'total']
@@ -475,22 +474,15 @@ class TestCheckout:
 
     @pytest.mark.checkout
     @pytest.mark.negative
+    @pytest.mark.offline_payment
     def test_checkout_payment_processing_failure(self):
         """Test checkout when payment processing fails."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
+        shipping_address = self.valid_address
         
         # Use a test card number that simulates payment failure
-        failing_payment = {
-            "card_number": "4000000000000002",  # Common test card for payment failure
-            "expiry_month": "12",
-            "expiry_year": "2025",
-            "cvv": "123",
-            "cardholder_name": "John Doe"
-        }
-        
         response = self.checkout_helper.submit_checkout(
             shipping_address, 
-            failing_payment, 
+            FAILING_PAYMENT, 
             self.checkout_endpoint
         )
         
@@ -499,32 +491,26 @@ class TestCheckout:
             assert ResponseValidator.validate_error_response(response), \
                 "Payment failure response should be properly formatted"
             
-            response_data = response.json()
-            error_message = response_data.get('error', '') + response_data.get('message', '')
-            assert any(keyword in error_message.lower() for keyword in 
-                      ['payment', 'declined', 'failed']), \
+            response_data = cached_json(response)
+            error_message = ResponseValidator.combined_error(response_data)
+            assert _PAYMENT_FAIL_RE.search(error_message), \
                 "Error should indicate payment failure"
 
     @pytest.mark.checkout
     @pytest.mark.regression
     def test_checkout_concurrent_requests(self):
-        """Test checkout behavior with concurrent requests."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        """Test that simultaneous submissions of one cart create at most one order."""
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
-        # Make multiple concurrent checkout attempts
-        responses = []
-        
-        for _ in range(3):
-            response = self.checkout_helper.submit_checkout(
-                shipping_address, 
-                payment_info, 
-                self.checkout_endpoint
-            )
-            responses.append(response)
-            
-            # Small delay to simulate near-concurrent requests
-            time.sleep(0.1)
+        # Submit the same cart three times at once, with no artificial delay
+        submit = functools.partial(
+            self.checkout_helper.submit_checkout,
+            shipping_address, 
+            payment_info, 
+            self.checkout_endpoint
+        )
+        responses = run_concurrently([submit] * 3)
         
         # Only one should succeed, or all should fail gracefully
         success_count = sum(1 for r in responses if r.status_code in [200, 201])
@@ -542,8 +528,8 @@ class TestCheckout:
     @pytest.mark.positive
     def test_get_order_details(self):
         """Test retrieving order details after successful checkout."""
-        shipping_address = self.test_data['checkout_data']['valid_address']
-        payment_info = self.test_data['checkout_data']['valid_payment']
+        shipping_address = self.valid_address
+        payment_info = self.valid_payment
         
         # Complete checkout first
         checkout_response = self.checkout_helper.submit_checkout(
@@ -553,7 +539,7 @@ class TestCheckout:
         )
         
         if checkout_response.status_code in [200, 201]:
-            checkout_data = checkout_response.json()
+            checkout_data = cached_json(checkout_response)
             order_id = checkout_data.get('order_id')
             
             if order_id:
@@ -569,7 +555,7 @@ class TestCheckout:
                 assert ResponseValidator.validate_json_response(order_response), \
                     "Order details should be valid JSON"
                 
-                order_data = order_response.json()
+                order_data = cached_json(order_response)
                 expected_fields = ['order_id', 'status', 'items', 'total', 'shipping_address']
                 
                 for field in expected_fields:
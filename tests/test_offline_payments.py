@@ -0,0 +1,109 @@
+"""
+Test cases for the --offline-payments checkout stub.
+Covers which payments get a canned response and which tests the stub applies to;
+these tests never contact the API.
+"""
+
+import pytest
+from tests.payment_stubs import (
+    EXPIRED_PAYMENT, FAILING_PAYMENT, INVALID_CARD_NUMBERS, TEST_CARD_PAYMENT,
+    canned_payment_failure
+)
+from utils.api_helpers import CheckoutHelper, ResponseValidator, cached_json
+
+
+_ADDRESS = {"street": "123 Main St", "city": "City", "state": "CA", "zip_code": "12345"}
+
+
+class _RecordingClient:
+    """Stands in for APIClient and records checkouts delegated to the backend."""
+
+    def __init__(self):
+        self.calls = []
+
+    def post(self, endpoint, **kwargs):
+        self.calls.append(endpoint)
+        return None
+
+
+class TestOfflinePayments:
+    """Test class for the offline payment stub."""
+
+    @pytest.mark.checkout
+    def test_declined_card_is_canned(self):
+        """Test that the always-declined test card gets a canned 402."""
+        response = canned_payment_failure(FAILING_PAYMENT)
+
+        assert response.status_code == 402, "Declined card should get a canned 402"
+        assert ResponseValidator.validate_error_response(response), \
+            "Canned response should be a properly formatted error"
+
+    @pytest.mark.checkout
+    @pytest.mark.parametrize("invalid_card", INVALID_CARD_NUMBERS.values(), ids=INVALID_CARD_NUMBERS.keys())
+    def test_invalid_card_numbers_are_canned(self, invalid_card):
+        """Test that every invalid card number used by the checkout tests is canned."""
+        response = canned_payment_failure({**TEST_CARD_PAYMENT, "card_number": invalid_card})
+
+        assert response is not None, f"Invalid card {invalid_card!r} should be canned"
+        assert response.status_code == 400, "Invalid card number should get a canned 400"
+
+    @pytest.mark.checkout
+    def test_expired_card_is_canned(self):
+        """Test that the expired-card payload gets a canned 400."""
+        response = canned_payment_failure(EXPIRED_PAYMENT)
+
+        assert response.status_code == 400, "Expired card should get a canned 400"
+        assert 'expired' in cached_json(response)['message'].lower(), \
+            "Canned response should say the card expired"
+
+    @pytest.mark.checkout
+    def test_canned_responses_are_fresh(self):
+        """Test that each canned response is a new object, since decoded bodies are cached on it."""
+        assert canned_payment_failure(FAILING_PAYMENT) is not canned_payment_failure(FAILING_PAYMENT)
+
+    @pytest.mark.checkout
+    @pytest.mark.parametrize("payment_info", [
+        pytest.param(TEST_CARD_PAYMENT, id="test_card"),
+        pytest.param({**TEST_CARD_PAYMENT, "expiry_year": "2019"}, id="other_expiry"),
+        pytest.param({**TEST_CARD_PAYMENT, "card_number": "378282246310005"}, id="amex_15_digits"),
+        pytest.param({**TEST_CARD_PAYMENT, "cvv": "12"}, id="short_cvv"),
+        pytest.param({}, id="no_payment_fields")
+    ])
+    def test_other_payments_are_not_canned(self, payment_info):
+        """Test that payments outside the known failure cards go to the backend."""
+        assert canned_payment_failure(payment_info) is None, \
+            "Only known payment-failure cards should be canned"
+
+    @pytest.mark.checkout
+    @pytest.mark.offline_payment
+    def test_marked_test_cans_failure_only_offline(self, request):
+        """Test that a marked test's failure card is canned only with --offline-payments."""
+        client = _RecordingClient()
+
+        response = CheckoutHelper(client).submit_checkout(_ADDRESS, FAILING_PAYMENT)
+
+        if request.config.getoption('--offline-payments'):
+            assert response.status_code == 402, "Failure card should be canned offline"
+            assert client.calls == [], "Canned checkout should not reach the backend"
+        else:
+            assert client.calls == ['/checkout/submit'], "Checkout should reach the backend"
+
+    @pytest.mark.checkout
+    @pytest.mark.offline_payment
+    def test_marked_test_delegates_other_cards(self):
+        """Test that a marked test still sends other payments to the backend."""
+        client = _RecordingClient()
+
+        CheckoutHelper(client).submit_checkout(_ADDRESS, TEST_CARD_PAYMENT)
+
+        assert client.calls == ['/checkout/submit'], "Valid card should reach the backend"
+
+    @pytest.mark.checkout
+    def test_unmarked_test_is_never_stubbed(self):
+        """Test that tests without the offline_payment marker always reach the backend."""
+        client = _RecordingClient()
+
+        CheckoutHelper(client).submit_checkout(_ADDRESS, FAILING_PAYMENT)
+
+        assert client.calls == ['/checkout/submit'], \
+            "Unmarked tests should never get canned responses"